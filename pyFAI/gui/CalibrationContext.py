@@ -218,11 +218,12 @@ class CalibrationContext(ApplicationContext):
         return self.__scatteringVectorUnit
 
     def getMarkerColor(self, index, mode="qt"):
+        if mode == "html":
+            colors = self.__htmlMarkerColorList()
+            return colors[index % len(colors)]
         colors = self.markerColorList()
         color = colors[index % len(colors)]
-        if mode == "html":
-            return "#%02X%02X%02X" % (color.red(), color.green(), color.blue())
-        elif mode == "numpy":
+        if mode == "numpy":
             return numpy.array([color.redF(), color.greenF(), color.blueF()])
         elif mode == "qt":
             return color
@@ -284,9 +285,7 @@ class CalibrationContext(ApplicationContext):
         return style
 
     def getHtmlMarkerColor(self, index):
-        colors = self.markerColorList()
-        color = colors[index % len(colors)]
-        "#%02X%02X%02X" % (color.red(), color.green(), color.blue())
+        return self.getMarkerColor(index, mode="html")
 
     def disabledMarkerColor(self):
         style = self.getCurrentStyle()
@@ -296,6 +295,18 @@ class CalibrationContext(ApplicationContext):
         return qt.QColor(*color)
 
     def markerColorList(self):
+        colors, _htmlColors = self.__cachedMarkerColors()
+        return colors
+
+    def __htmlMarkerColorList(self):
+        _colors, htmlColors = self.__cachedMarkerColors()
+        return htmlColors
+
+    def __cachedMarkerColors(self):
+        """Returns the marker colors as Qt colors and as HTML strings.
+
+        Both are computed once per colormap.
+        """
         colormap = self.getRawColormap()
         name = colormap['name']
         if name not in self.__markerColors:
@@ -307,10 +318,9 @@ class CalibrationContext(ApplicationContext):
                     colors.append(c)
             else:
                 colors = self.createMarkerColors()
-            self.__markerColors[name] = colors
-        else:
-            colors = self.__markerColors[name]
-        return colors
+            htmlColors = ["#%02X%02X%02X" % (c.red(), c.green(), c.blue()) for c in colors]
+            self.__markerColors[name] = colors, htmlColors
+        return self.__markerColors[name]
 
     def createMarkerColors(self):
         colormap = self.getRawColormap()
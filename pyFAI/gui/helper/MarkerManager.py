@@ -27,11 +27,14 @@ from __future__ import absolute_import
 
 __authors__ = ["V. Valls"]
 __license__ = "MIT"
-__date__ = "14/05/2019"
+__date__ = "15/10/2026"
 
 import logging
-import functools
+import heapq
+import math
+import re
 import numpy
+from scipy.spatial import cKDTree
 
 from silx.gui import qt
 
@@ -51,53 +54,94 @@ class MarkerManager(object):
 
     _ITEM_TEMPLATE = "__markers__%s"
 
+    _NAME_TEMPLATE = "mark%d"
+
+    _NAME_PATTERN = re.compile(r"^mark(\d+)$")
+
+    _KDTREE_MIN_MARKERS = 64
+    """Minimal amount of markers to use a KD-tree to find the closest one"""
+
     def __init__(self, plot, markerModel, pixelBasedPlot=False):
         self.__plot = plot
         self.__markerModel = markerModel
-        self.__markerModel.changed.connect(self.__updateMarkers)
+        self.__markerModel.changed.connect(self.__markerModelChanged)
         self.__geometry = None
-        self.__markers = []
+        self.__markerSnapshot = None
+        self.__markerLocations = None
+        self.__markerPixels = None
+        # Reusable input for single pixel geometry requests
+        self.__pixelBuffer = numpy.empty((2, 1), dtype=numpy.float64)
+        self.__displayedMarkers = {}
+        self.__markerNames = None
+        self.__nextMarkerId = 0
+        self.__freeMarkerIds = []
+        self.__isChangingModel = False
         self.__pixelBasedPlot = pixelBasedPlot
-        self.__radialUnit = None
+        self.__tthRadToPlot = None
+        self.__plotToTthRad = None
         self.__mustBeUpdated = False
+        # Owned by the plot, so it can't fire after the plot destruction
+        self.__updateTimer = qt.QTimer(self.__plot)
+        self.__updateTimer.setSingleShot(True)
+        self.__updateTimer.setInterval(0)
+        self.__updateTimer.timeout.connect(self.__updateMarkers)
+        self.__actions = {}
+        self.__removeActionMarker = None
+        self.__markPixelActionPos = None
+        self.__markGeometryActionPos = None
 
         eventutils.createShowSignal(self.__plot)
         self.__plot.sigShown.connect(self.__plotIsShown)
 
+    def dispose(self):
+        """Stop synchronizing the model with the plot.
+
+        Disconnect the signals, remove the markers and the reused actions
+        from the plot. The manager can't be used anymore after this call.
+        """
+        self.__markerModel.changed.disconnect(self.__markerModelChanged)
+        self.__plot.sigShown.disconnect(self.__plotIsShown)
+        self.__updateTimer.stop()
+        for legend in self.__displayedMarkers:
+            self.__plot.removeMarker(legend)
+        self.__displayedMarkers = {}
+        for action in self.__actions.values():
+            action.triggered.disconnect()
+            action.deleteLater()
+        self.__actions = {}
+        self.__removeActionMarker = None
+        self.__markPixelActionPos = None
+        self.__markGeometryActionPos = None
+
     def updateProjection(self, geometry, radialUnit, wavelength, directDist, redraw=True):
         if self.__pixelBasedPlot:
             raise RuntimeError("Invalide operation for this kind of plot")
         self.__geometry = geometry
-        self.__radialUnit = radialUnit
         self.__invertGeometry = InvertGeometry(
-            self.__geometry.array_from_unit(typ="center", unit=self.__radialUnit, scale=True),
+            self.__geometry.array_from_unit(typ="center", unit=radialUnit, scale=True),
             numpy.rad2deg(self.__geometry.chiArray()))
-        self.__wavelength = wavelength
-        self.__directDist = directDist
+        try:
+            self.__tthRadToPlot = unitutils.from2ThRadConverter(
+                radialUnit, wavelength=wavelength, directDist=directDist)
+            self.__plotToTthRad = unitutils.tthToRadConverter(
+                radialUnit, wavelength=wavelength, directDist=directDist)
+        except Exception:
+            _logger.debug("Backtrace", exc_info=True)
+            self.__tthRadToPlot = None
+            self.__plotToTthRad = None
+        self.__invalidateMarkerLocations()
         if redraw:
             self.__updateMarkers()
 
     def updatePhysicalMarkerPixels(self, geometry):
         self.__geometry = geometry
-        if geometry is None:
-            self.__wavelength = None
-            self.__directDist = None
-        else:
-            self.__wavelength = geometry.wavelength
-            try:
-                self.__directDist = geometry.getFit2D()["directDist"]
-            except Exception:
-                # The geometry could not fit this param
-                _logger.debug("Backtrace", exc_info=True)
-                self.__directDist = None
-
         if geometry is not None:
             invertGeometry = InvertGeometry(
                 geometry.array_from_unit(typ="center", unit=pyFAI.units.TTH_RAD, scale=False),
                 geometry.chiArray())
 
         self.__markerModel.lockSignals()
-        for marker in self.__markerModel:
+        for marker in self.__getMarkers():
             if not isinstance(marker, MarkerModel.PhysicalMarker):
                 continue
 
@@ -105,10 +149,7 @@ class MarkerManager(object):
             pixel = None
             if geometry is not None:
                 pixel = invertGeometry(tthRad, chiRad, True)
-
-                ax, ay = numpy.array([pixel[1]]), numpy.array([pixel[0]])
-                tth = geometry.tth(ay, ax)[0]
-                chi = geometry.chi(ay, ax)[0]
+                chi, tth = self.__pixelToChiTth(geometry, pixel[1], pixel[0])
 
                 error = numpy.sqrt((tthRad - tth) ** 2 + (chiRad - chi) ** 2)
                 if error > 0.05:
@@ -122,6 +163,42 @@ class MarkerManager(object):
         self.__markerModel.wasChanged()
         self.__markerModel.unlockSignals()
 
+    def __invalidateMarkerLocations(self):
+        self.__markerLocations = None
+        self.__markerPixels = None
+
+    def __pixelToChiTth(self, geometry, x, y):
+        """Returns chi and 2theta angles in radian of a single pixel location.
+
+        The geometry only accepts arrays, so a preallocated buffer is reused.
+        """
+        ax, ay = self.__pixelBuffer
+        ax[0], ay[0] = x, y
+        chi = geometry.chi(ay, ax)[0]
+        tth = geometry.tth(ay, ax)[0]
+        return chi, tth
+
+    def __getMarkers(self):
+        """Returns an immutable snapshot of the markers of the model.
+
+        It is cached until the model changes.
+
+        :rtype: Tuple[MarkerModel.Marker]
+        """
+        if self.__markerSnapshot is None:
+            self.__markerSnapshot = tuple(self.__markerModel)
+        return self.__markerSnapshot
+
+    def __markerModelChanged(self):
+        self.__markerSnapshot = None
+        self.__invalidateMarkerLocations()
+        if not self.__isChangingModel:
+            # Someone else changed the model, names have to be fetched again
+            self.__markerNames = None
+        # Successive changes are coalesced into a single refresh
+        if not self.__updateTimer.isActive():
+            self.__updateTimer.start()
+
     def __plotIsShown(self):
         if self.__mustBeUpdated:
             self.__updateMarkers()
@@ -134,131 +211,348 @@ class MarkerManager(object):
 
         self.__mustBeUpdated = False
 
-        for item in self.__markers:
-            self.__plot.removeMarker(item.getLegend())
-
         color = CalibrationContext.instance().getMarkerColor(0, mode="html")
-        for marker in self.__markerModel:
-            position = self.getMarkerLocation(marker)
-            if position is None:
-                continue
+        # Also feeds the cache used by findClosestMarker
+        markers, xs, ys = self.__allMarkerPlotLocations()
+        displayed = {}
+        for marker, x, y in zip(markers, xs, ys):
             legend = self._ITEM_TEMPLATE % marker.name()
-            self.__plot.addMarker(x=position[0], y=position[1], color=color, legend=legend, text=marker.name())
-            item = self.__plot._getMarker(legend)
-            self.__markers.append(item)
+            displayed[legend] = marker.name(), x, y, color
+
+        # Only update the plot items which have changed
+        for legend in set(self.__displayedMarkers) - set(displayed):
+            self.__plot.removeMarker(legend)
+        for legend, description in displayed.items():
+            if self.__displayedMarkers.get(legend, None) == description:
+                continue
+            name, x, y, color = description
+            # Replaces the previous item using the same legend
+            self.__plot.addMarker(x=x, y=y, color=color, legend=legend, text=name)
+        self.__displayedMarkers = displayed
 
     def getMarkerLocation(self, marker):
         """
         Returns the location of the marker in the plot axes
         """
         if self.__pixelBasedPlot:
-            if isinstance(marker, MarkerModel.PhysicalMarker):
-                return marker.pixelPosition()
-            elif isinstance(marker, MarkerModel.PixelMarker):
-                return marker.pixelPosition()
-            else:
-                _logger.debug("Unsupported marker %s", type(marker))
-                return None
+            return marker.pixelPosition()
         else:
-            if isinstance(marker, MarkerModel.PhysicalMarker):
-                chiRad, tthRad = marker.physicalPosition()
-            elif isinstance(marker, MarkerModel.PixelMarker):
-                if self.__geometry is None:
-                    return None
-                x, y = marker.pixelPosition()
-                ax, ay = numpy.array([x]), numpy.array([y])
-                chiRad = self.__geometry.chi(ay, ax)[0]
-                tthRad = self.__geometry.tth(ay, ax)[0]
+            markers, xs, ys = self.__allMarkerPlotLocations()
+            try:
+                index = markers.index(marker)
+            except ValueError:
+                pass
             else:
-                _logger.debug("Unsupported marker %s", type(marker))
+                return xs[index], ys[index]
+            markers, xs, ys = self.__computeMarkerLocations([marker])
+            if len(markers) == 0:
                 return None
+            return xs[0], ys[0]
 
-            if self.__radialUnit is None:
-                return
+    def __allMarkerPlotLocations(self):
+        """
+        Returns the markers which can be displayed with their locations in the
+        plot axes.
 
-            try:
-                tth = unitutils.from2ThRad(tthRad,
-                                           unit=self.__radialUnit,
-                                           wavelength=self.__wavelength,
-                                           directDist=self.__directDist)
-                chi = numpy.rad2deg(chiRad)
-            except Exception:
-                _logger.debug("Backtrace", exc_info=True)
-                return None
-            return tth, chi
+        The result is cached until the model or the projection changes.
+
+        :rtype: Tuple[Tuple[MarkerModel.Marker],numpy.ndarray,numpy.ndarray]
+        """
+        if self.__markerLocations is None:
+            self.__markerLocations = self.__computeMarkerLocations(self.__getMarkers())
+        return self.__markerLocations
+
+    def __computeMarkerLocations(self, markerList):
+        """Compute the location of a list of markers at once.
+
+        The geometry is only called once for all the pixel markers.
+
+        :param Iterable[MarkerModel.Marker] markerList: Markers to locate
+        :returns: The markers which can be located, with their locations in
+            the plot axes
+        :rtype: Tuple[Tuple[MarkerModel.Marker],numpy.ndarray,numpy.ndarray]
+        """
+        markers = []
+        if self.__pixelBasedPlot:
+            xs, ys = [], []
+            for marker in markerList:
+                location = marker.pixelPosition()
+                if location is None:
+                    continue
+                markers.append(marker)
+                xs.append(location[0])
+                ys.append(location[1])
+            xs = numpy.array(xs, dtype=numpy.float64)
+            ys = numpy.array(ys, dtype=numpy.float64)
+            return tuple(markers), xs, ys
+
+        empty = numpy.array([], dtype=numpy.float64)
+        if self.__tthRadToPlot is None:
+            return (), empty, empty
+
+        chiRads, tthRads = [], []
+        pixelIndexes, pixelXs, pixelYs = [], [], []
+        for marker in markerList:
+            physicalPosition = marker.physicalPosition()
+            if physicalPosition is not None:
+                chiRad, tthRad = physicalPosition
+            else:
+                pixelPosition = marker.pixelPosition()
+                if pixelPosition is None or self.__geometry is None:
+                    continue
+                x, y = pixelPosition
+                pixelIndexes.append(len(markers))
+                pixelXs.append(x)
+                pixelYs.append(y)
+                chiRad, tthRad = None, None
+            markers.append(marker)
+            chiRads.append(chiRad)
+            tthRads.append(tthRad)
+
+        # Undefined positions are converted to NaN
+        chiRads = numpy.array(chiRads, dtype=numpy.float64)
+        tthRads = numpy.array(tthRads, dtype=numpy.float64)
+        if len(pixelIndexes) > 0:
+            ax = numpy.array(pixelXs, dtype=numpy.float64)
+            ay = numpy.array(pixelYs, dtype=numpy.float64)
+            chiRads[pixelIndexes] = self.__geometry.chi(ay, ax)
+            tthRads[pixelIndexes] = self.__geometry.tth(ay, ax)
+
+        try:
+            xs, ys = self.__chiTthToPlot(chiRads, tthRads)
+        except Exception:
+            _logger.debug("Backtrace", exc_info=True)
+            return (), empty, empty
+
+        valid = numpy.logical_and(numpy.isfinite(xs), numpy.isfinite(ys))
+        if not numpy.all(valid):
+            markers = [m for m, v in zip(markers, valid) if v]
+            xs, ys = xs[valid], ys[valid]
+        return tuple(markers), xs, ys
+
+    def __chiTthToPlot(self, chiRads, tthRads):
+        """Convert arrays of chi/2theta angles in radian to the plot axes.
+
+        :param numpy.ndarray chiRads: Chi angles in radian
+        :param numpy.ndarray tthRads: 2theta angles in radian
+        :rtype: Tuple[numpy.ndarray,numpy.ndarray]
+        """
+        xs = self.__tthRadToPlot(tthRads)
+        xs = numpy.asarray(xs, dtype=numpy.float64)
+        # The chi array is not used anymore by the caller
+        ys = numpy.rad2deg(chiRads, out=chiRads)
+        return xs, ys
+
+    def __viewState(self):
+        """Returns a description of the view which identifies the transformation
+        from data to pixel coordinates."""
+        xAxis = self.__plot.getXAxis()
+        yAxis = self.__plot.getYAxis()
+        return (xAxis.getLimits(), xAxis.getScale(),
+                yAxis.getLimits(), yAxis.getScale(), yAxis.isInverted(),
+                tuple(self.__plot.getPlotBoundsInPixels()))
+
+    def __dataToPixels(self, xs, ys):
+        """Convert arrays of locations from data to pixel coordinates.
+
+        The plot API only converts a single location at a time. With linear
+        axes the transformation is affine, so it is computed from 2 locations
+        and applied to the whole arrays.
+
+        :rtype: Tuple[numpy.ndarray,numpy.ndarray]
+        """
+        xAxis = self.__plot.getXAxis()
+        yAxis = self.__plot.getYAxis()
+        if xAxis.getScale() == xAxis.LINEAR and yAxis.getScale() == yAxis.LINEAR:
+            xmin, xmax = xAxis.getLimits()
+            ymin, ymax = yAxis.getLimits()
+            if xmin != xmax and ymin != ymax:
+                px0, py0 = self.__plot.dataToPixel(x=xmin, y=ymin, check=False)
+                px1, py1 = self.__plot.dataToPixel(x=xmax, y=ymax, check=False)
+                pxs = px0 + (xs - xmin) * ((px1 - px0) / (xmax - xmin))
+                pys = py0 + (ys - ymin) * ((py1 - py0) / (ymax - ymin))
+                return pxs, pys
+
+        pxs = numpy.empty(len(xs), dtype=numpy.float64)
+        pys = numpy.empty(len(ys), dtype=numpy.float64)
+        for i, (x, y) in enumerate(zip(xs, ys)):
+            pxs[i], pys[i] = self.__plot.dataToPixel(x=x, y=y, check=False)
+        return pxs, pys
+
+    def __getMarkerPixels(self):
+        """
+        Returns the locations in pixels of the markers inside the view.
+
+        The x and y locations are stored in separated arrays. A KD-tree of the
+        locations is also provided when there is enough markers for it to be
+        worth it, else it is None.
+
+        The result is computed lazily and reused while the markers and the
+        view are not changed.
+
+        :rtype: Tuple[Tuple[MarkerModel.Marker],numpy.ndarray,numpy.ndarray,Union[None,cKDTree]]
+        """
+        viewState = self.__viewState()
+        if self.__markerPixels is not None and self.__markerPixels[0] == viewState:
+            return self.__markerPixels[1:]
+
+        markers, xs, ys = self.__allMarkerPlotLocations()
+
+        # Markers outside of the view are not displayed, they can't be picked
+        xmin, xmax = self.__plot.getXAxis().getLimits()
+        ymin, ymax = self.__plot.getYAxis().getLimits()
+        visible = numpy.logical_and(xs >= xmin, xs <= xmax)
+        visible &= numpy.logical_and(ys >= ymin, ys <= ymax)
+        if not numpy.all(visible):
+            markers = tuple([m for m, v in zip(markers, visible) if v])
+            xs, ys = xs[visible], ys[visible]
+
+        pxs, pys = self.__dataToPixels(xs, ys)
+        if len(markers) >= self._KDTREE_MIN_MARKERS:
+            tree = cKDTree(numpy.column_stack((pxs, pys)))
+        else:
+            tree = None
+        self.__markerPixels = viewState, markers, pxs, pys, tree
+        return markers, pxs, pys, tree
 
     def findClosestMarker(self, mousePos, delta=20):
-        delta = delta ** 2.0
         if isinstance(mousePos, qt.QPoint):
             mousePos = mousePos.x(), mousePos.y()
-        currentMarker = None
-        currentDistance = float("inf")
-        for marker in self.__markerModel:
-            location = self.getMarkerLocation(marker)
-            if location is None:
-                continue
-            location = self.__plot.dataToPixel(x=location[0], y=location[1], check=False)
-            distance = (mousePos[0] - location[0]) ** 2.0 + (mousePos[1] - location[1]) ** 2.0
-            if distance < currentDistance and distance < delta:
-                currentDistance = distance
-                currentMarker = marker
-        return currentMarker
+        mx, my = mousePos
+        markers, pxs, pys, tree = self.__getMarkerPixels()
+        if len(markers) == 0:
+            return None
+        if tree is not None:
+            indexes = numpy.array(tree.query_ball_point(mousePos, r=delta), dtype=int)
+        else:
+            # Only keep the markers inside the box around the mouse
+            inside = numpy.abs(pxs - mx) <= delta
+            inside &= numpy.abs(pys - my) <= delta
+            indexes = numpy.flatnonzero(inside)
+        if len(indexes) == 0:
+            return None
+        dx = pxs[indexes] - mx
+        dy = pys[indexes] - my
+        distances = dx * dx + dy * dy
+        index = numpy.argmin(distances)
+        if not distances[index] < delta * delta:
+            return None
+        return markers[indexes[index]]
+
+    def __getAction(self, name, slot):
+        """Returns an action reused between context menus.
+
+        The action is shared by all the menus it is added to, so it is owned
+        by the plot rather than by one of them.
+        """
+        action = self.__actions.get(name, None)
+        if action is None:
+            action = qt.QAction(self.__plot)
+            action.triggered.connect(slot)
+            self.__actions[name] = action
+        return action
 
     def createRemoveClosestMaskerAction(self, parent, mousePos):
-        action = qt.QAction(parent)
+        """Returns an action removing the marker closest to the mouse, else
+        None if there is no marker close enough.
 
+        :param parent: Unused. The action is owned by the plot and reused
+            between calls
+        :param mousePos: Mouse location in pixels
+        """
         marker = self.findClosestMarker(mousePos)
         if marker is None:
             return None
 
+        action = self.__getAction("remove", self.__removeActionTriggered)
         action.setText("Remove marker '%s'" % marker.name())
-        action.triggered.connect(functools.partial(self.__removeMarker, marker))
+        self.__removeActionMarker = marker
         return action
 
     def createMarkPixelAction(self, parent, mousePos):
-        maskPixelAction = qt.QAction(parent)
+        """Returns an action marking the pixel at the mouse location.
+
+        :param parent: Unused. The action is owned by the plot and reused
+            between calls
+        :param qt.QPoint mousePos: Mouse location in pixels
+        """
+        maskPixelAction = self.__getAction("markPixel", self.__markPixelActionTriggered)
         maskPixelAction.setText("Mark this pixel coord")
-        maskPixelAction.triggered.connect(functools.partial(self.__createPixelMarker, mousePos))
+        self.__markPixelActionPos = mousePos
         if not self.__pixelBasedPlot:
             maskPixelAction.setEnabled(self.__geometry is not None)
         return maskPixelAction
 
     def createMarkGeometryAction(self, parent, mousePos):
-        maskGeometryAction = qt.QAction(parent)
+        """Returns an action marking the chi/2theta angles at the mouse
+        location.
+
+        :param parent: Unused. The action is owned by the plot and reused
+            between calls
+        :param qt.QPoint mousePos: Mouse location in pixels
+        """
+        maskGeometryAction = self.__getAction("markGeometry", self.__markGeometryActionTriggered)
         maskGeometryAction.setText(u"Mark this χ/2θ coord")
-        maskGeometryAction.triggered.connect(functools.partial(self.__createGeometryMarker, mousePos))
+        self.__markGeometryActionPos = mousePos
         maskGeometryAction.setEnabled(self.__geometry is not None)
         return maskGeometryAction
 
+    def __removeActionTriggered(self):
+        self.__removeMarker(self.__removeActionMarker)
+
+    def __markPixelActionTriggered(self):
+        self.__createPixelMarker(self.__markPixelActionPos)
+
+    def __markGeometryActionTriggered(self):
+        self.__createGeometryMarker(self.__markGeometryActionPos)
+
     def dataToChiTth(self, data):
         """Returns chi and 2theta angles in radian from data coordinate"""
 
         if self.__pixelBasedPlot:
             x, y = data
-            ax, ay = numpy.array([x]), numpy.array([y])
-            chi = self.__geometry.chi(ay, ax)[0]
-            tth = self.__geometry.tth(ay, ax)[0]
-            return chi, tth
+            return self.__pixelToChiTth(self.__geometry, x, y)
         else:
             try:
-                tthRad = unitutils.tthToRad(data[0],
-                                            unit=self.__radialUnit,
-                                            wavelength=self.__wavelength,
-                                            directDist=self.__directDist)
+                tthRad = self.__plotToTthRad(data[0])
             except Exception:
                 _logger.debug("Backtrace", exc_info=True)
                 tthRad = None
 
             chiDeg = data[1]
             if chiDeg is not None:
-                chiRad = numpy.deg2rad(chiDeg)
+                # Scalar value, math is cheaper than a numpy ufunc
+                chiRad = math.radians(chiDeg)
             else:
                 chiRad = None
 
             return chiRad, tthRad
 
+    def __addMarker(self, marker):
+        self.__isChangingModel = True
+        try:
+            self.__markerModel.add(marker)
+        finally:
+            self.__isChangingModel = False
+
     def __removeMarker(self, marker):
-        self.__markerModel.remove(marker)
+        self.__isChangingModel = True
+        try:
+            self.__markerModel.remove(marker)
+        finally:
+            self.__isChangingModel = False
+        if self.__markerNames is not None:
+            name = marker.name()
+            for m in self.__getMarkers():
+                if m.name() == name:
+                    # Another marker still uses this name
+                    return
+            self.__markerNames.discard(name)
+            match = self._NAME_PATTERN.match(name)
+            if match is not None:
+                markerId = int(match.group(1))
+                if markerId < self.__nextMarkerId:
+                    heapq.heappush(self.__freeMarkerIds, markerId)
 
     def __createPixelMarker(self, pos):
         pos = self.__plot.pixelToData(pos.x(), pos.y())
@@ -271,9 +565,7 @@ class MarkerManager(object):
             # TODO: This could be avoided by checking it inside invertGeometry
             chiRad, tthRad = self.dataToChiTth(pos)
             if tthRad is not None and chiRad is not None:
-                ax, ay = numpy.array([pixel[1]]), numpy.array([pixel[0]])
-                tth = self.__geometry.tth(ay, ax)[0]
-                chi = self.__geometry.chi(ay, ax)[0]
+                chi, tth = self.__pixelToChiTth(self.__geometry, pixel[1], pixel[0])
 
                 error = numpy.sqrt((tthRad - tth) ** 2 + (chiRad - chi) ** 2)
                 if error > 0.05:
@@ -282,7 +574,7 @@ class MarkerManager(object):
 
         name = self.__findUnusedMarkerName()
         marker = MarkerModel.PixelMarker(name, pixel[1], pixel[0])
-        self.__markerModel.add(marker)
+        self.__addMarker(marker)
 
     def __createGeometryMarker(self, pos):
         pos = self.__plot.pixelToData(pos.x(), pos.y())
@@ -299,14 +591,30 @@ class MarkerManager(object):
             else:
                 marker.removePixelPosition()
 
-        self.__markerModel.add(marker)
+        self.__addMarker(marker)
 
     def __findUnusedMarkerName(self):
-        template = "mark%d"
-        markerNames = set([m.name() for m in self.__markerModel])
-        for i in range(0, 1000):
-            name = template % i
-            if name not in markerNames:
-                return name
-        # Returns something
-        return "mark"
+        """Returns the lowest unused marker name.
+
+        The names are only fetched from the model when it was changed by
+        someone else, as it can be shared with other managers. Else the names
+        and the ids freed by this manager are updated incrementally.
+        """
+        if self.__markerNames is None:
+            self.__markerNames = set([m.name() for m in self.__getMarkers()])
+            self.__nextMarkerId = 0
+            self.__freeMarkerIds = []
+        name = None
+        while len(self.__freeMarkerIds) > 0:
+            markerId = heapq.heappop(self.__freeMarkerIds)
+            if self._NAME_TEMPLATE % markerId not in self.__markerNames:
+                name = self._NAME_TEMPLATE % markerId
+                break
+        if name is None:
+            name = self._NAME_TEMPLATE % self.__nextMarkerId
+            while name in self.__markerNames:
+                self.__nextMarkerId += 1
+                name = self._NAME_TEMPLATE % self.__nextMarkerId
+            self.__nextMarkerId += 1
+        self.__markerNames.add(name)
+        return name
@@ -41,6 +41,14 @@ class Marker(object):
     def name(self):
         return self.__name
 
+    def pixelPosition(self):
+        """Returns the pixel location of the marker, else None"""
+        return None
+
+    def physicalPosition(self):
+        """Returns the chi/tth location of the marker, else None"""
+        return None
+
 
 class PixelMarker(Marker):
     """Mark a pixel at a specific location of an image"""
@@ -30,6 +30,7 @@ __license__ = "MIT"
 __date__ = "17/05/2019"
 
 import logging
+import math
 import numpy
 
 from silx.gui import qt
@@ -430,6 +431,7 @@ class IntegrationPlot(qt.QFrame):
         self.__radialUnit = None
         self.__wavelength = None
         self.__directDist = None
+        self.__plotToTthRad = None
         self.__geometry = None
         self.__inverseGeometry = None
 
@@ -537,17 +539,15 @@ class IntegrationPlot(qt.QFrame):
     def dataToChiTth(self, data):
         """Returns chi and 2theta angles in radian from data coordinate"""
         try:
-            tthRad = unitutils.tthToRad(data[0],
-                                        unit=self.__radialUnit,
-                                        wavelength=self.__wavelength,
-                                        directDist=self.__directDist)
+            tthRad = self.__plotToTthRad(data[0])
         except Exception:
             _logger.debug("Backtrace", exc_info=True)
             tthRad = None
 
         chiDeg = data[1]
         if chiDeg is not None:
-            chiRad = numpy.deg2rad(chiDeg)
+            # Scalar value, math is cheaper than a numpy ufunc
+            chiRad = math.radians(chiDeg)
         else:
             chiRad = None
 
@@ -842,6 +842,14 @@ class IntegrationPlot(qt.QFrame):
         self.__radialUnit = integrationProcess.radialUnit()
         self.__wavelength = integrationProcess.wavelength()
         self.__directDist = integrationProcess.directDist()
+        try:
+            self.__plotToTthRad = unitutils.tthToRadConverter(
+                self.__radialUnit,
+                wavelength=self.__wavelength,
+                directDist=self.__directDist)
+        except Exception:
+            _logger.debug("Backtrace", exc_info=True)
+            self.__plotToTthRad = None
         self.__geometry = integrationProcess.geometry()
         self.__inverseGeometry = InvertGeometry(
             self.__geometry.array_from_unit(typ="center", unit=self.__radialUnit, scale=True),
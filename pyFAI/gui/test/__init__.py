@@ -80,6 +80,7 @@ def suite():
         return test_suite
 
     from . import test_model
+    from . import test_marker_manager
     from . import test_integrate_widget
     from . import test_scripts
     from . import test_calibration
@@ -87,6 +88,7 @@ def suite():
     from ..utils import test as test_utils
     test_suite = unittest.TestSuite()
     test_suite.addTest(test_model.suite())
+    test_suite.addTest(test_marker_manager.suite())
     test_suite.addTest(test_integrate_widget.suite())
     test_suite.addTest(test_scripts.suite())
     test_suite.addTest(test_calibration.suite())
@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+# coding: utf-8
+#
+#    Project: Azimuthal integration
+#             https://github.com/silx-kit/pyFAI
+#
+#    Copyright (C) 2019 European Synchrotron Radiation Facility, Grenoble, France
+#
+#    Principal author:       Jérôme Kieffer (Jerome.Kieffer@ESRF.eu)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+from __future__ import absolute_import, division, print_function
+
+"""Test suite for the marker manager"""
+
+__author__ = "Valentin Valls"
+__contact__ = "valentin.valls@esrf.fr"
+__license__ = "MIT"
+__copyright__ = "European Synchrotron Radiation Facility, Grenoble, France"
+__date__ = "15/10/2026"
+
+import unittest
+import logging
+
+from silx.gui import qt
+from silx.gui.utils import testutils
+from silx.gui.plot import PlotWidget
+import pyFAI.resources
+from ..CalibrationContext import CalibrationContext
+from ..model import MarkerModel
+from ..helper.MarkerManager import MarkerManager
+
+
+_logger = logging.getLogger(__name__)
+
+
+class _Plot(PlotWidget):
+    """Plot recording the legends of the added markers"""
+
+    def __init__(self, parent=None):
+        PlotWidget.__init__(self, parent=parent)
+        self.addedMarkers = []
+
+    def addMarker(self, *args, **kwargs):
+        self.addedMarkers.append(kwargs.get("legend"))
+        return PlotWidget.addMarker(self, *args, **kwargs)
+
+
+class TestMarkerManager(testutils.TestCaseQt):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestMarkerManager, cls).setUpClass()
+        pyFAI.resources.silx_integration()
+
+    def setUp(self):
+        # FIXME: It would be good to remove this singleton
+        CalibrationContext._releaseSingleton()
+        super(TestMarkerManager, self).setUp()
+        self.context = CalibrationContext(qt.QSettings())
+        self.plot = _Plot()
+        self.plot.resize(400, 400)
+        self.plot.show()
+        self.qWaitForWindowExposed(self.plot)
+        self.plot.setLimits(0, 100, 0, 100)
+        self.model = MarkerModel.MarkerModel()
+        self.manager = MarkerManager(self.plot, self.model, pixelBasedPlot=True)
+
+    def tearDown(self):
+        self.manager = None
+        self.plot.setAttribute(qt.Qt.WA_DeleteOnClose)
+        self.plot.close()
+        self.plot = None
+        self.model = None
+        self.context = None
+        CalibrationContext._releaseSingleton()
+        super(TestMarkerManager, self).tearDown()
+
+    def test_coalesced_refresh(self):
+        a = MarkerModel.PixelMarker("a", 10, 10)
+        b = MarkerModel.PixelMarker("b", 20, 20)
+        c = MarkerModel.PixelMarker("c", 30, 30)
+        self.model.add(a)
+        self.model.add(b)
+        self.model.add(c)
+        self.model.remove(b)
+        # The refresh is deferred
+        self.assertEqual(self.plot.addedMarkers, [])
+        self.qWait(50)
+        # A single refresh, the removed marker was never displayed
+        self.assertEqual(sorted(self.plot.addedMarkers), ["__markers__a", "__markers__c"])
+
+    def test_dispose(self):
+        self.model.add(MarkerModel.PixelMarker("a", 10, 10))
+        self.qWait(50)
+        self.assertIsNotNone(self.plot._getMarker("__markers__a"))
+        action = self.manager.createMarkPixelAction(None, self.__plotPosition(0))
+
+        self.model.add(MarkerModel.PixelMarker("b", 20, 20))
+        self.manager.dispose()
+        self.assertIsNone(self.plot._getMarker("__markers__a"))
+
+        # The reused action is released
+        action.trigger()
+        self.assertEqual(len(self.model), 2)
+
+        # Neither the pending refresh nor a new change are displayed
+        self.model.add(MarkerModel.PixelMarker("c", 30, 30))
+        self.qWait(50)
+        self.assertEqual(self.plot.addedMarkers, ["__markers__a"])
+
+    def __plotPosition(self, offset):
+        """Returns a mouse position at an horizontal offset from the center
+        of the plot"""
+        left, top, width, height = self.plot.getPlotBoundsInPixels()
+        return qt.QPoint(left + width // 2 + offset, top + height // 2)
+
+    def __markPixel(self, offset):
+        action = self.manager.createMarkPixelAction(None, self.__plotPosition(offset))
+        action.trigger()
+
+    def __markerNames(self):
+        return [m.name() for m in self.model]
+
+    def test_marker_names(self):
+        self.__markPixel(-50)
+        self.__markPixel(0)
+        self.__markPixel(50)
+        self.assertEqual(self.__markerNames(), ["mark0", "mark1", "mark2"])
+
+        # Removed by the manager
+        action = self.manager.createRemoveClosestMaskerAction(None, self.__plotPosition(0))
+        action.trigger()
+        self.assertEqual(self.__markerNames(), ["mark0", "mark2"])
+        self.__markPixel(0)
+        self.assertEqual(self.__markerNames(), ["mark0", "mark2", "mark1"])
+
+        # Removed by someone else
+        self.model.remove(list(self.model)[0])
+        self.__markPixel(-50)
+        self.assertEqual(self.__markerNames(), ["mark2", "mark1", "mark0"])
+        self.__markPixel(-20)
+        self.assertEqual(self.__markerNames(), ["mark2", "mark1", "mark0", "mark3"])
+
+        # Empty model
+        for marker in list(self.model):
+            self.model.remove(marker)
+        self.__markPixel(0)
+        self.assertEqual(self.__markerNames(), ["mark0"])
+
+        # Removed one of two markers sharing a name
+        self.model.add(MarkerModel.PixelMarker("mark0", 10, 50))
+        self.__markPixel(20)
+        self.assertEqual(self.__markerNames(), ["mark0", "mark0", "mark1"])
+        x, y = self.plot.dataToPixel(10, 50)
+        action = self.manager.createRemoveClosestMaskerAction(None, qt.QPoint(int(x), int(y)))
+        action.trigger()
+        self.__markPixel(-20)
+        self.assertEqual(self.__markerNames(), ["mark0", "mark1", "mark2"])
+
+    def __checkClosestMarker(self, manager):
+        a = MarkerModel.PixelMarker("a", 30, 50)
+        b = MarkerModel.PixelMarker("b", 70, 50)
+        self.model.add(a)
+        self.model.add(b)
+        ax, ay = self.plot.dataToPixel(30, 50)
+        bx, by = self.plot.dataToPixel(70, 50)
+        delta = 10
+        # Around the distance limit
+        self.assertIs(manager.findClosestMarker((ax + delta - 0.1, ay), delta=delta), a)
+        self.assertIsNone(manager.findClosestMarker((ax + delta + 0.1, ay), delta=delta))
+        self.assertIs(manager.findClosestMarker((ax, ay - delta + 0.1), delta=delta), a)
+        self.assertIsNone(manager.findClosestMarker((ax, ay - delta - 0.1), delta=delta))
+        # The closest of many markers in range
+        self.assertIs(manager.findClosestMarker((bx - 1, by), delta=1000), b)
+        self.assertIs(manager.findClosestMarker((ax + 1, ay), delta=1000), a)
+        # Nothing in range
+        self.assertIsNone(manager.findClosestMarker(((ax + bx) * 0.5, ay), delta=delta))
+
+    def test_closest_marker(self):
+        manager = MarkerManager(self.plot, self.model, pixelBasedPlot=True)
+        manager._KDTREE_MIN_MARKERS = 1000
+        self.__checkClosestMarker(manager)
+
+    def test_closest_marker_kdtree(self):
+        manager = MarkerManager(self.plot, self.model, pixelBasedPlot=True)
+        manager._KDTREE_MIN_MARKERS = 1
+        self.__checkClosestMarker(manager)
+
+    def test_marker_pixel_locations(self):
+        self.plot.setLimits(-10, 90, 20, 60)
+        markers = []
+        for i, (x, y) in enumerate([(-5, 25), (0, 40), (42.5, 33.3), (85, 55)]):
+            marker = MarkerModel.PixelMarker("m%d" % i, x, y)
+            self.model.add(marker)
+            markers.append(marker)
+        for inverted in (False, True):
+            self.plot.getYAxis().setInverted(inverted)
+            self.qWait(10)
+            for marker in markers:
+                x, y = marker.pixelPosition()
+                # The pixel location must match the plot per point
+                pixel = self.plot.dataToPixel(x, y, check=False)
+                self.assertIs(self.manager.findClosestMarker(pixel, delta=0.01), marker)
+
+
+def suite():
+    loader = unittest.defaultTestLoader.loadTestsFromTestCase
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(loader(TestMarkerManager))
+    return testsuite
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner()
+    runner.run(suite())
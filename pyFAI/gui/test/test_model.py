@@ -44,6 +44,7 @@ from silx.gui.utils import testutils
 from ..model.PeakModel import PeakModel
 from ..model.ListModel import ListModel
 from ..model.DataModel import DataModel
+from ..model import MarkerModel
 
 
 _logger = logging.getLogger(__name__)
@@ -128,11 +129,25 @@ class TestListModel(testutils.TestCaseQt):
         self.assertTrue(events.hasOnlyUpdateEvents())
 
 
+class TestMarkerModel(testutils.TestCaseQt):
+
+    def test_positions(self):
+        pixel = MarkerModel.PixelMarker("a", 10, 20)
+        self.assertEqual(pixel.pixelPosition(), (10, 20))
+        self.assertIsNone(pixel.physicalPosition())
+        physical = MarkerModel.PhysicalMarker("b", 0.5, 0.1)
+        self.assertEqual(physical.physicalPosition(), (0.5, 0.1))
+        self.assertIsNone(physical.pixelPosition())
+        physical.setPixelPosition(1, 2)
+        self.assertEqual(physical.pixelPosition(), (1, 2))
+
+
 def suite():
     loader = unittest.defaultTestLoader.loadTestsFromTestCase
     testsuite = unittest.TestSuite()
     testsuite.addTest(loader(TestPeakModelization))
     testsuite.addTest(loader(TestListModel))
+    testsuite.addTest(loader(TestMarkerModel))
     return testsuite
 
 
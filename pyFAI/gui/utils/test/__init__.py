@@ -25,9 +25,11 @@ __date__ = "30/10/2018"
 
 import unittest
 from . import test_validators
+from . import test_unitutils
 
 
 def suite():
     testSuite = unittest.TestSuite()
     testSuite.addTests(test_validators.suite())
+    testSuite.addTests(test_unitutils.suite())
     return testSuite
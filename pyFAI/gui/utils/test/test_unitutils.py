@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# coding: utf-8
+#
+#    Project: Azimuthal integration
+#             https://github.com/silx-kit/pyFAI
+#
+#    Copyright (C) 2019 European Synchrotron Radiation Facility, Grenoble, France
+#
+#    Principal author:       Jérôme Kieffer (Jerome.Kieffer@ESRF.eu)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+from __future__ import absolute_import, division, print_function
+
+"""Test suite for unitutils"""
+
+__author__ = "Valentin Valls"
+__contact__ = "valentin.valls@esrf.fr"
+__license__ = "MIT"
+__copyright__ = "European Synchrotron Radiation Facility, Grenoble, France"
+__date__ = "15/10/2026"
+
+import unittest
+import logging
+import numpy
+
+from pyFAI import units
+from .. import unitutils
+
+
+_logger = logging.getLogger(__name__)
+
+
+class _Fit2DGeometry(object):
+
+    def getFit2D(self):
+        return {"directDist": 100.0}
+
+
+class TestUnitUtils(unittest.TestCase):
+
+    TTH = numpy.array([0.1, 0.5, 1.0])
+
+    WAVELENGTH = 1e-10
+
+    DIRECT_DIST = 100.0
+
+    def expected(self):
+        """Returns the expected conversion of TTH for each unit"""
+        sin = numpy.sin(0.5 * self.TTH)
+        tan = numpy.tan(self.TTH)
+        return [
+            (units.TTH_RAD, self.TTH),
+            (units.TTH_DEG, self.TTH * 180.0 / numpy.pi),
+            (units.Q_A, 4.0 * numpy.pi * sin),
+            (units.Q_NM, 40.0 * numpy.pi * sin),
+            (units.R_MM, 100.0 * tan),
+            (units.R_M, 0.1 * tan),
+        ]
+
+    def test_from2ThRad(self):
+        for unit, expected in self.expected():
+            result = unitutils.from2ThRad(self.TTH, unit,
+                                          wavelength=self.WAVELENGTH,
+                                          directDist=self.DIRECT_DIST)
+            numpy.testing.assert_allclose(result, expected, err_msg=str(unit))
+
+    def test_from2ThRadConverter(self):
+        for unit, expected in self.expected():
+            converter = unitutils.from2ThRadConverter(unit,
+                                                      wavelength=self.WAVELENGTH,
+                                                      directDist=self.DIRECT_DIST)
+            numpy.testing.assert_allclose(converter(self.TTH), expected, err_msg=str(unit))
+
+    def test_tthToRad(self):
+        for unit, data in self.expected():
+            result = unitutils.tthToRad(data, unit,
+                                        wavelength=self.WAVELENGTH,
+                                        directDist=self.DIRECT_DIST)
+            numpy.testing.assert_allclose(result, self.TTH, err_msg=str(unit))
+
+    def test_tthToRadConverter(self):
+        for unit, data in self.expected():
+            converter = unitutils.tthToRadConverter(unit,
+                                                    wavelength=self.WAVELENGTH,
+                                                    directDist=self.DIRECT_DIST)
+            numpy.testing.assert_allclose(converter(data), self.TTH, err_msg=str(unit))
+
+    def test_from2ThRad_ai(self):
+        result = unitutils.from2ThRad(self.TTH, units.R_MM, ai=_Fit2DGeometry())
+        numpy.testing.assert_allclose(result, 100.0 * numpy.tan(self.TTH))
+
+    def test_missing_parameters(self):
+        with self.assertRaises(AttributeError):
+            unitutils.from2ThRadConverter(units.Q_A)
+        with self.assertRaises(AttributeError):
+            unitutils.tthToRadConverter(units.R_MM)
+
+    def test_unsupported_unit(self):
+        with self.assertRaises(ValueError) as context:
+            unitutils.from2ThRadConverter("foo")
+        self.assertIn("foo", str(context.exception))
+        with self.assertRaises(ValueError) as context:
+            unitutils.tthToRadConverter("foo")
+        self.assertIn("foo", str(context.exception))
+
+
+def suite():
+    loader = unittest.defaultTestLoader.loadTestsFromTestCase
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(loader(TestUnitUtils))
+    return testsuite
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner()
+    runner.run(suite())
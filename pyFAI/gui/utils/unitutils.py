@@ -24,7 +24,7 @@
 
 __authors__ = ["V. Valls"]
 __license__ = "MIT"
-__date__ = "03/01/2019"
+__date__ = "15/10/2026"
 
 
 import numpy
@@ -44,59 +44,76 @@ def tthToRad(twoTheta, unit, wavelength=None, directDist=None):
     elif isinstance(twoTheta, collections.Iterable):
         twoTheta = numpy.array(twoTheta)
 
+    converter = tthToRadConverter(unit, wavelength=wavelength, directDist=directDist)
+    return converter(twoTheta)
+
+
+def from2ThRad(twoTheta, unit, wavelength=None, directDist=None, ai=None):
+    if isinstance(twoTheta, numpy.ndarray):
+        pass
+    elif isinstance(twoTheta, collections.Iterable):
+        twoTheta = numpy.array(twoTheta)
+
+    if directDist is None and ai is not None and unit in (units.R_MM, units.R_M):
+        directDist = ai.getFit2D()["directDist"]  # in mm!!
+    converter = from2ThRadConverter(unit, wavelength=wavelength, directDist=directDist)
+    return converter(twoTheta)
+
+
+def tthToRadConverter(unit, wavelength=None, directDist=None):
+    """
+    Returns a function converting two theta angles from original `unit` to
+    radian.
+
+    The constants of the conversion are computed once, which is cheaper than
+    calling :func:`tthToRad` for each value.
+
+    `directDist = ai.getFit2D()["directDist"]`
+    """
     if unit == units.TTH_RAD:
-        return twoTheta
+        return lambda twoTheta: twoTheta
     elif unit == units.TTH_DEG:
-        return numpy.deg2rad(twoTheta)
-    elif unit == units.Q_A:
-        if wavelength is None:
-            raise AttributeError("wavelength have to be specified")
-        return numpy.arcsin((twoTheta * wavelength) / (4.e-10 * numpy.pi)) * 2.0
-    elif unit == units.Q_NM:
+        return numpy.deg2rad
+    elif unit in (units.Q_A, units.Q_NM):
         if wavelength is None:
             raise AttributeError("wavelength have to be specified")
-        return numpy.arcsin((twoTheta * wavelength) / (4.e-9 * numpy.pi)) * 2.0
-    elif unit == units.R_MM:
+        scale = 4.e-10 if unit == units.Q_A else 4.e-9
+        factor = wavelength / (scale * numpy.pi)
+        return lambda twoTheta: numpy.arcsin(twoTheta * factor) * 2.0
+    elif unit in (units.R_MM, units.R_M):
         if directDist is None:
             raise AttributeError("directDist have to be specified")
         # GF: correct formula?
-        return numpy.arctan(twoTheta / directDist)
-    elif unit == units.R_M:
-        if directDist is None:
-            raise AttributeError("directDist have to be specified")
-        # GF: correct formula?
-        return numpy.arctan(twoTheta / (directDist * 0.001))
+        distance = directDist if unit == units.R_MM else directDist * 0.001
+        return lambda twoTheta: numpy.arctan(twoTheta / distance)
     else:
-        raise ValueError("Converting from 2th to unit %s is not supported", unit)
+        raise ValueError("Converting from unit %s to 2th is not supported" % unit)
 
 
-def from2ThRad(twoTheta, unit, wavelength=None, directDist=None, ai=None):
-    if isinstance(twoTheta, numpy.ndarray):
-        pass
-    elif isinstance(twoTheta, collections.Iterable):
-        twoTheta = numpy.array(twoTheta)
+def from2ThRadConverter(unit, wavelength=None, directDist=None):
+    """
+    Returns a function converting two theta angles from radian to `unit`.
 
+    The constants of the conversion are computed once, which is cheaper than
+    calling :func:`from2ThRad` for each value.
+
+    `directDist = ai.getFit2D()["directDist"]`
+    """
     if unit == units.TTH_DEG:
-        return numpy.rad2deg(twoTheta)
+        return numpy.rad2deg
     elif unit == units.TTH_RAD:
-        return twoTheta
-    elif unit == units.Q_A:
-        return (4.e-10 * numpy.pi / wavelength) * numpy.sin(.5 * twoTheta)
-    elif unit == units.Q_NM:
-        return (4.e-9 * numpy.pi / wavelength) * numpy.sin(.5 * twoTheta)
-    elif unit == units.R_MM:
-        # GF: correct formula?
-        if directDist is not None:
-            beamCentre = directDist
-        else:
-            beamCentre = ai.getFit2D()["directDist"]  # in mm!!
-        return beamCentre * numpy.tan(twoTheta)
-    elif unit == units.R_M:
+        return lambda twoTheta: twoTheta
+    elif unit in (units.Q_A, units.Q_NM):
+        if wavelength is None:
+            raise AttributeError("wavelength have to be specified")
+        scale = 4.e-10 if unit == units.Q_A else 4.e-9
+        factor = scale * numpy.pi / wavelength
+        return lambda twoTheta: factor * numpy.sin(.5 * twoTheta)
+    elif unit in (units.R_MM, units.R_M):
+        if directDist is None:
+            raise AttributeError("directDist have to be specified")
         # GF: correct formula?
-        if directDist is not None:
-            beamCentre = directDist
-        else:
-            beamCentre = ai.getFit2D()["directDist"]  # in mm!!
-        return beamCentre * numpy.tan(twoTheta) * 0.001
+        distance = directDist if unit == units.R_MM else directDist * 0.001
+        return lambda twoTheta: distance * numpy.tan(twoTheta)
     else:
-        raise ValueError("Converting from 2th to unit %s is not supported", unit)
+        raise ValueError("Converting from 2th to unit %s is not supported" % unit)